@@ -1,4 +1,5 @@
 import asyncio
+import datetime
 import random
 import time
 from collections import deque
@@ -9,6 +10,7 @@ from spade.behaviour import CyclicBehaviour, PeriodicBehaviour, OneShotBehaviour
 from spade.message import Message
 
 from src.sim.metrics import Metrics
+from src.sim import profiling, snapshot
 
 
 def poisson_knuth(lmbda: float) -> int:
@@ -43,6 +45,12 @@ class BankAgent(Agent):
         scenario: str,
         real_duration_s: float = 120.0,
         tick_real_s: float = 0.5,
+        restore_from: snapshot.BankSnapshot | None = None,
+        snapshot_path: str = "results/snapshot.bin",
+        snapshot_at_minute: float | None = None,
+        checkpoint_every_sim_min: float | None = None,
+        until_minute: float | None = None,
+        seed: int | None = None,
     ):
         super().__init__(jid, password)
         self.teller_jids = teller_jids
@@ -53,15 +61,28 @@ class BankAgent(Agent):
         self.sim_ended = False
         self.start_wall_ts: float | None = None
         self.end_wall_ts: float | None = None
+        self.close_wall_ts: float | None = None
 
         self.queue: Deque[str] = deque()
         self.free_tellers: Set[str] = set(teller_jids)
         self.busy_customer_by_teller: Dict[str, str] = {}
+        self.service_time_by_customer: Dict[str, float] = {}
 
         self.metrics = Metrics()
 
         self.spawned_customers = [] 
 
+        self.restore_from = restore_from
+        self.snapshot_path = snapshot_path
+        self.snapshot_at_minute = snapshot_at_minute
+        self.checkpoint_every_sim_min = checkpoint_every_sim_min
+        self.until_minute = until_minute
+
+        if restore_from is not None and restore_from.rng_state is not None:
+            random.setstate(restore_from.rng_state)
+        if seed is not None:
+            random.seed(seed)
+
         self.lunch_group_1 = set(teller_jids[:2])
         self.lunch_group_2 = set(teller_jids[2:4])
 
@@ -123,6 +144,33 @@ class BankAgent(Agent):
         sim_min = random.uniform(8.0, 22.0)
         return sim_min / self.sim_minutes_per_real_second()
 
+    def save_snapshot(self, path: str | None = None) -> None:
+        path = path or self.snapshot_path
+        snapshot.capture(self).save(path)
+        print(f"[BANK] Snapshot spremljen: {path} (sim {self.sim_minute_of_day():.1f} min)")
+
+    def begin_run(self, offset_sim_minutes: float = 0.0) -> None:
+        self.start_wall_ts = self.now() - offset_sim_minutes / self.sim_minutes_per_real_second()
+        self.close_wall_ts = self.start_wall_ts + self.real_duration_s
+        self.end_wall_ts = self.close_wall_ts
+        if self.until_minute is not None:
+            until_elapsed = self.until_minute - self.START_HOUR * 60
+            until_ts = self.start_wall_ts + until_elapsed / self.sim_minutes_per_real_second()
+            self.end_wall_ts = min(self.end_wall_ts, until_ts)
+
+        self.add_behaviour(self.ListenBehaviour())
+        self.add_behaviour(self.ArrivalGenerator(period=self.tick_real_s))
+        self.add_behaviour(self.Stopper())
+
+        if self.snapshot_at_minute is not None and self.snapshot_at_minute > self.sim_minute_of_day():
+            self.add_behaviour(self.SnapshotWriter())
+        if self.checkpoint_every_sim_min:
+            period = self.checkpoint_every_sim_min / self.sim_minutes_per_real_second()
+            first = datetime.datetime.now() + datetime.timedelta(seconds=period)
+            self.add_behaviour(self.Checkpointer(period=period, start_at=first))
+
+        profiling.instrument(self)
+
     async def try_dispatch(self, beh) -> None:
         self.update_free_tellers_by_schedule()
 
@@ -174,6 +222,7 @@ class BankAgent(Agent):
                 self.agent.metrics.set_end(customer_jid, self.agent.now())
 
                 self.agent.busy_customer_by_teller.pop(teller_jid, None)
+                self.agent.service_time_by_customer.pop(customer_jid, None)
 
                 if self.agent.is_teller_available_now(teller_jid) and not self.agent.sim_ended:
                     self.agent.free_tellers.add(teller_jid)
@@ -188,7 +237,8 @@ class BankAgent(Agent):
         async def run(self):
             if not self.agent.is_bank_open():
                 return
-            if self.agent.end_wall_ts is not None and (self.agent.end_wall_ts - self.agent.now()) <= 10.0:
+            # Dolasci staju pred stvarno zatvaranje banke, ne pred --until kraj runa.
+            if self.agent.close_wall_ts is not None and (self.agent.close_wall_ts - self.agent.now()) <= 10.0:
                 self.agent.metrics.add_queue_point(self.agent.now(), len(self.agent.queue))
                 return
 
@@ -225,9 +275,12 @@ class BankAgent(Agent):
                     bank_jid=str(self.agent.jid),
                     service_time=service_time_real,
                 )
+                # Mora biti zapisano prije start(): ARRIVE može stići dok start() još traje.
+                self.agent.service_time_by_customer[customer_jid] = service_time_real
                 await c.start(auto_register=True)
 
                 if self.agent.sim_ended:
+                    self.agent.service_time_by_customer.pop(customer_jid, None)
                     try:
                         await c.stop()
                     except Exception:
@@ -241,7 +294,7 @@ class BankAgent(Agent):
 
     class Stopper(OneShotBehaviour):
         async def run(self):
-            await asyncio.sleep(self.agent.real_duration_s)
+            await asyncio.sleep(max(0.0, self.agent.end_wall_ts - self.agent.now()))
 
             print("[BANK] Simulacija gotova -> spremam metrike u results/")
 
@@ -266,6 +319,9 @@ class BankAgent(Agent):
                     pass
 
             self.agent.metrics.write_csv("results")
+            profiler = profiling.get()
+            if profiler is not None:
+                profiler.write_json("results")
 
             for t in self.agent.teller_jids:
                 m = Message(to=t)
@@ -275,11 +331,83 @@ class BankAgent(Agent):
             await asyncio.sleep(0.3)
             await self.agent.stop()
 
+    class SnapshotWriter(OneShotBehaviour):
+        async def run(self):
+            delay_sim = self.agent.snapshot_at_minute - self.agent.sim_minute_of_day()
+            await asyncio.sleep(max(0.0, delay_sim / self.agent.sim_minutes_per_real_second()))
+            if not self.agent.sim_ended:
+                self.agent.save_snapshot()
+
+    class Checkpointer(PeriodicBehaviour):
+        async def run(self):
+            if self.agent.sim_ended:
+                return
+            self.agent.save_snapshot()
+
+    class Restorer(OneShotBehaviour):
+        async def run(self):
+            snap = self.agent.restore_from
+            from src.agents.customer import CustomerAgent
+
+            # Klijenti iz snapshota se ponovno pokreću bez ARRIVE poruke,
+            # jer ih banka već ima u redu / na šalteru.
+            restored: Dict[str, float] = dict(snap.service_sim_min_by_customer)
+            for teller, sim_min in snap.remaining_sim_min_by_teller.items():
+                restored[snap.busy_customer_by_teller[teller]] = sim_min
+
+            for customer_jid, sim_min in restored.items():
+                c = CustomerAgent(
+                    customer_jid,
+                    "password",
+                    bank_jid=str(self.agent.jid),
+                    service_time=sim_min / self.agent.sim_minutes_per_real_second(),
+                    announce=False,
+                )
+                await c.start(auto_register=True)
+                self.agent.spawned_customers.append(c)
+
+            self.agent.begin_run(offset_sim_minutes=snap.sim_minutes_elapsed)
+
+            to_real = self.agent.sim_minutes_per_real_second()
+            self.agent.metrics = snapshot.restore_metrics(snap, self.agent.start_wall_ts, to_real)
+            self.agent.service_time_by_customer = {
+                c: m / to_real for c, m in snap.service_sim_min_by_customer.items()
+            }
+            self.agent.queue.extend(snap.queue)
+
+            self.agent.busy_customer_by_teller.update(snap.busy_customer_by_teller)
+            self.agent.free_tellers.difference_update(snap.busy_customer_by_teller)
+            self.agent.metrics.add_queue_point(self.agent.now(), len(self.agent.queue))
+
+            for teller, customer_jid in snap.busy_customer_by_teller.items():
+                serve = Message(to=teller)
+                serve.body = f"SERVE|{customer_jid}"
+                await self.send(serve)
+
+            print(
+                f"[BANK] Stanje vraćeno iz snapshota: sim {self.agent.sim_minute_of_day():.1f} min, "
+                f"red={len(self.agent.queue)}, zauzeto={len(self.agent.busy_customer_by_teller)}, "
+                f"u dolasku={len(snap.in_flight_sim_min_by_customer)}"
+            )
+            await self.agent.try_dispatch(self)
+
+            # Dolasci koji su bili u tijeku kad je snapshot uzet ponovno šalju ARRIVE.
+            for customer_jid, sim_min in snap.in_flight_sim_min_by_customer.items():
+                service_time_real = sim_min / to_real
+                self.agent.service_time_by_customer[customer_jid] = service_time_real
+                c = CustomerAgent(
+                    customer_jid,
+                    "password",
+                    bank_jid=str(self.agent.jid),
+                    service_time=service_time_real,
+                    announce=True,
+                )
+                await c.start(auto_register=True)
+                self.agent.spawned_customers.append(c)
+
     async def setup(self):
         print(f"[BANK] setup() pozvan: {self.jid} | scenarij={self.scenario}")
-        self.start_wall_ts = self.now()
-        self.end_wall_ts = self.start_wall_ts + self.real_duration_s
-
-        self.add_behaviour(self.ListenBehaviour())
-        self.add_behaviour(self.ArrivalGenerator(period=self.tick_real_s))
-        self.add_behaviour(self.Stopper())
+        if self.restore_from is not None:
+            self.add_behaviour(self.Restorer())
+        else:
+            self.begin_run()
@@ -2,12 +2,15 @@ from spade.agent import Agent
 from spade.behaviour import OneShotBehaviour, CyclicBehaviour
 from spade.message import Message
 
+from src.sim import profiling
+
 
 class CustomerAgent(Agent):
-    def __init__(self, jid, password, bank_jid: str, service_time: float):
+    def __init__(self, jid, password, bank_jid: str, service_time: float, announce: bool = True):
         super().__init__(jid, password)
         self.bank_jid = bank_jid
         self.service_time = service_time  # real seconds (scaled from sim minutes)
+        self.announce = announce  # False kad se klijent vraća iz snapshota (banka ga već ima u redu)
 
     class ArriveBehaviour(OneShotBehaviour):
         async def run(self):
@@ -41,5 +44,7 @@ class CustomerAgent(Agent):
 
     async def setup(self):
         print(f"[CUSTOMER] setup() pozvan: {self.jid}")
-        self.add_behaviour(self.ArriveBehaviour())
+        if self.announce:
+            self.add_behaviour(self.ArriveBehaviour())
         self.add_behaviour(self.ListenBehaviour())
+        profiling.instrument(self, aggregate=True)
@@ -1,8 +1,9 @@
-import asyncio
 from spade.agent import Agent
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
 
+from src.sim import profiling
+
 
 class TellerAgent(Agent):
     def __init__(self, jid, password, bank_jid: str):
@@ -35,7 +36,7 @@ class TellerAgent(Agent):
                 customer_jid = parts[1]
                 service_time = float(parts[2])
 
-                await asyncio.sleep(service_time)
+                await profiling.modelled_sleep(service_time)
 
                 done = Message(to=self.agent.bank_jid)
                 done.body = f"DONE|{customer_jid}|{service_time}|{self.agent.jid}"
@@ -44,3 +45,4 @@ class TellerAgent(Agent):
     async def setup(self):
         print(f"[TELLER] setup() pozvan: {self.jid}")
         self.add_behaviour(self.ListenBehaviour())
+        profiling.instrument(self)
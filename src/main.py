@@ -1,13 +1,17 @@
 import asyncio
 import sys
+import zlib
 
 from src.agents.bank import BankAgent
 from src.agents.teller import TellerAgent
+from src.sim import profiling
+from src.sim.snapshot import BankSnapshot
 
 
-def parse_scenario(argv: list[str]) -> str:
-    if len(argv) < 2:
-        return "normal"
+def parse_scenario(argv: list[str]) -> str | None:
+    # None znači da scenarij nije zadan (npr. `python -m src.main --restore snap.bin`).
+    if len(argv) < 2 or argv[1].startswith("--"):
+        return None
     s = argv[1].strip().lower()
     if s in ("normal", "pocetak_mjeseca"):
         return s
@@ -16,8 +20,79 @@ def parse_scenario(argv: list[str]) -> str:
     return "normal"
 
 
+def parse_clock(s: str) -> float:
+    hh, mm = s.split(":", 1)
+    return int(hh) * 60 + int(mm)
+
+
+def parse_options(argv: list[str]) -> dict:
+    # python -m src.main <scenarij> [--snapshot-at HH:MM] [--snapshot-out PATH]
+    #   [--checkpoint-every SIM_MIN] [--restore PATH] [--until HH:MM] [--seed N] [--profile]
+    opts = {
+        "snapshot_at_minute": None,
+        "snapshot_path": "results/snapshot.bin",
+        "checkpoint_every_sim_min": None,
+        "restore": None,
+        "until_minute": None,
+        "seed": None,
+        "profile": False,
+    }
+    args = list(argv[1:])
+    if args and not args[0].startswith("--"):
+        args.pop(0)  # scenarij
+    while args:
+        flag = args.pop(0)
+        if flag == "--profile":
+            opts["profile"] = True
+            continue
+        if not args:
+            print(f"Opcija {flag} nema vrijednost (ignoriram)")
+            break
+        value = args.pop(0)
+        try:
+            if flag == "--snapshot-at":
+                opts["snapshot_at_minute"] = parse_clock(value)
+            elif flag == "--snapshot-out":
+                opts["snapshot_path"] = value
+            elif flag == "--checkpoint-every":
+                every = float(value)
+                if every <= 0:
+                    raise ValueError(value)
+                opts["checkpoint_every_sim_min"] = every
+            elif flag == "--restore":
+                opts["restore"] = value
+            elif flag == "--until":
+                opts["until_minute"] = parse_clock(value)
+            elif flag == "--seed":
+                opts["seed"] = int(value)
+            else:
+                print(f"Nepoznata opcija: {flag} (ignoriram)")
+        except ValueError:
+            print(f"Neispravna vrijednost za opciju {flag}: {value} (ignoriram)")
+    return opts
+
+
 async def main():
     scenario = parse_scenario(sys.argv)
+    opts = parse_options(sys.argv)
+
+    restore_from = None
+    if opts["restore"]:
+        try:
+            restore_from = BankSnapshot.load(opts["restore"])
+        except (OSError, ValueError, KeyError, TypeError, zlib.error) as e:
+            print(f"Ne mogu učitati snapshot {opts['restore']}: {e}. Prekidam.")
+            return
+    if restore_from is not None:
+        if scenario is not None and scenario != restore_from.scenario:
+            print(
+                f"Snapshot {opts['restore']} je iz scenarija {restore_from.scenario}, "
+                f"a zadan je {scenario}. Prekidam."
+            )
+            return
+        scenario = restore_from.scenario
+    scenario = scenario or "normal"
+    profiler = profiling.enable() if opts["profile"] else None
 
     password = "password"
     bank_jid = "bank@localhost"
@@ -36,6 +111,12 @@ async def main():
         scenario=scenario,
         real_duration_s=120.0,
         tick_real_s=0.5,
+        restore_from=restore_from,
+        snapshot_path=opts["snapshot_path"],
+        snapshot_at_minute=opts["snapshot_at_minute"],
+        checkpoint_every_sim_min=opts["checkpoint_every_sim_min"],
+        until_minute=opts["until_minute"],
+        seed=opts["seed"],
     )
 
     tellers = [TellerAgent(tj, password, bank_jid=bank_jid) for tj in teller_jids]
@@ -55,6 +136,9 @@ async def main():
 
     await asyncio.sleep(1.0)
 
+    if profiler is not None:
+        profiler.stop()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
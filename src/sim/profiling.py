@@ -0,0 +1,227 @@
+import asyncio
+import json
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List
+
+from spade.behaviour import OneShotBehaviour, PeriodicBehaviour
+
+
+# Granice bucketa u milisekundama; zadnji bucket je sve iznad 10 s.
+BUCKET_BOUNDS_MS: List[float] = [
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+]
+
+
+# Stanje behavioura čiji run() se trenutno izvršava (svaki behaviour je zaseban task).
+_current_run: ContextVar[dict | None] = ContextVar("_current_run", default=None)
+
+
+async def modelled_sleep(seconds: float) -> None:
+    # Čekanje koje modelira simulirano vrijeme (npr. trajanje usluge na šalteru),
+    # a ne rad behavioura; profiler ga ne broji u busy time.
+    t0 = time.perf_counter()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        state = _current_run.get()
+        if state is not None:
+            state["waited"] += time.perf_counter() - t0
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def quantile(self, q: float) -> float | None:
+        # Gornja granica bucketa u kojem je kvantil (gruba, ali jeftina procjena).
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "max_ms": self.max_ms,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": self.buckets,
+        }
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.samples = 0
+        self.total = 0
+        self.max = 0
+        self.last = 0
+
+    def set(self, value: int) -> None:
+        self.samples += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "mean": self.total / self.samples if self.samples else None,
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class Profiler:
+    def __init__(self, lag_interval_s: float = 0.1) -> None:
+        self.lag_interval_s = lag_interval_s
+        self.busy_time: Dict[str, Histogram] = {}
+        self.receive_wait: Dict[str, Histogram] = {}
+        self.tick_drift: Dict[str, Histogram] = {}
+        self.tick_period_s: Dict[str, float] = {}
+        self.loop_lag = Histogram()
+        self.mailbox_depth: Dict[str, Gauge] = {}
+        self._agents: Dict[str, tuple[object, str]] = {}
+        self.started_ts: float | None = None
+        self._lag_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.started_ts = time.time()
+        self._lag_task = asyncio.get_running_loop().create_task(self._measure_loop_lag())
+
+    def stop(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+
+    async def _measure_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval_s
+            await asyncio.sleep(self.lag_interval_s)
+            self.loop_lag.observe(max(0.0, loop.time() - expected) * 1000.0)
+            self._sample_mailboxes()
+
+    def _sample_mailboxes(self) -> None:
+        # Uzorkuje se neovisno o run(), pa se vidi i red koji raste dok je behaviour blokiran.
+        depth: Dict[str, int] = {}
+        for jid, (agent, gauge_key) in list(self._agents.items()):
+            if not agent.is_alive():
+                del self._agents[jid]
+                continue
+            size = sum(b.mailbox_size() for b in agent.behaviours)
+            depth[gauge_key] = depth.get(gauge_key, 0) + size
+        for gauge_key, size in depth.items():
+            self.mailbox_depth[gauge_key].set(size)
+
+    def instrument(self, agent, aggregate: bool = False) -> None:
+        # aggregate=True za kratkotrajne agente (klijente): jedan gauge po klasi
+        # sa zbrojem mailboxa svih živih agenata, umjesto gaugea po JID-u.
+        gauge_key = type(agent).__name__ if aggregate else str(agent.jid)
+        self._agents[str(agent.jid)] = (agent, gauge_key)
+        self.mailbox_depth.setdefault(gauge_key, Gauge())
+        for beh in agent.behaviours:
+            if isinstance(beh, OneShotBehaviour) or getattr(beh, "_profiled", False):
+                continue
+            self._wrap(agent, beh)
+
+    def _wrap(self, agent, beh) -> None:
+        key = f"{type(agent).__name__}.{type(beh).__name__}"
+        run_hist = self.busy_time.setdefault(key, Histogram())
+        wait_hist = self.receive_wait.setdefault(key, Histogram())
+        drift_hist = None
+        if isinstance(beh, PeriodicBehaviour):
+            drift_hist = self.tick_drift.setdefault(key, Histogram())
+            self.tick_period_s[key] = beh.period.total_seconds()
+
+        orig_run = beh.run
+        orig_receive = beh.receive
+        state = {"waited": 0.0, "last_start": None}
+
+        async def receive(timeout: float | None = None):
+            t0 = time.perf_counter()
+            try:
+                return await orig_receive(timeout=timeout)
+            finally:
+                waited = time.perf_counter() - t0
+                state["waited"] += waited
+                wait_hist.observe(waited * 1000.0)
+
+        async def run():
+            t0 = time.perf_counter()
+            if drift_hist is not None:
+                if state["last_start"] is not None:
+                    interval = t0 - state["last_start"]
+                    drift_hist.observe(abs(interval - self.tick_period_s[key]) * 1000.0)
+                state["last_start"] = t0
+            state["waited"] = 0.0
+            token = _current_run.set(state)
+            try:
+                await orig_run()
+            finally:
+                _current_run.reset(token)
+                # Čekanje poruke i modelirano trajanje usluge nisu rad behavioura.
+                busy = time.perf_counter() - t0 - state["waited"]
+                run_hist.observe(max(0.0, busy) * 1000.0)
+
+        beh.receive = receive
+        beh.run = run
+        beh._profiled = True
+
+    def report(self) -> dict:
+        return {
+            "duration_s": time.time() - self.started_ts if self.started_ts is not None else None,
+            "bucket_bounds_ms": BUCKET_BOUNDS_MS,
+            "event_loop_lag": self.loop_lag.to_dict(),
+            "behaviour_busy_time": {k: h.to_dict() for k, h in self.busy_time.items()},
+            "behaviour_receive_wait": {k: h.to_dict() for k, h in self.receive_wait.items() if h.count},
+            "periodic_tick_drift": {
+                k: {"period_s": self.tick_period_s[k], **h.to_dict()} for k, h in self.tick_drift.items()
+            },
+            "mailbox_depth": {k: g.to_dict() for k, g in self.mailbox_depth.items()},
+        }
+
+    def write_json(self, out_dir: str = "results") -> None:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        path = Path(out_dir) / "profile.json"
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+_profiler: Profiler | None = None
+
+
+def enable(lag_interval_s: float = 0.1) -> Profiler:
+    global _profiler
+    _profiler = Profiler(lag_interval_s=lag_interval_s)
+    _profiler.start()
+    return _profiler
+
+
+def get() -> Profiler | None:
+    return _profiler
+
+
+def instrument(agent, aggregate: bool = False) -> None:
+    if _profiler is not None:
+        _profiler.instrument(agent, aggregate=aggregate)
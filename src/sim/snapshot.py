@@ -0,0 +1,131 @@
+import json
+import random
+import zlib
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, List
+
+from src.sim.metrics import CustomerRecord, Metrics
+
+
+SNAPSHOT_VERSION = 2
+
+
+@dataclass
+class BankSnapshot:
+    # Sva vremena su u simulacijskim minutama od početka radnog dana (08:00),
+    # tako da se snapshot može vratiti i uz drugačiji real_duration_s.
+    version: int
+    scenario: str
+    sim_minutes_elapsed: float
+    queue: List[str]
+    service_sim_min_by_customer: Dict[str, float]
+    busy_customer_by_teller: Dict[str, str]
+    remaining_sim_min_by_teller: Dict[str, float]
+    # Klijenti pokrenuti prije snapshota čiji ARRIVE banka još nije obradila.
+    in_flight_sim_min_by_customer: Dict[str, float]
+    customers: List[tuple] = field(default_factory=list)
+    queue_series: List[tuple[float, int]] = field(default_factory=list)
+    rng_state: tuple | None = None
+
+    def dumps(self) -> bytes:
+        # JSON umjesto pickle-a: učitavanje tuđeg snapshota ne smije moći izvršiti kod.
+        return zlib.compress(json.dumps(asdict(self), separators=(",", ":")).encode("utf-8"), 9)
+
+    @classmethod
+    def loads(cls, data: bytes) -> "BankSnapshot":
+        raw = json.loads(zlib.decompress(data).decode("utf-8"))
+        if not isinstance(raw, dict) or raw.get("version") != SNAPSHOT_VERSION:
+            version = raw.get("version") if isinstance(raw, dict) else None
+            raise ValueError(f"Nepodržana verzija snapshota: {version}")
+        # JSON nema tuple, a random.setstate() i ostatak koda ih očekuju.
+        raw["customers"] = [tuple(row) for row in raw["customers"]]
+        raw["queue_series"] = [tuple(row) for row in raw["queue_series"]]
+        if raw["rng_state"] is not None:
+            v, s, g = raw["rng_state"]
+            raw["rng_state"] = (v, tuple(s), g)
+        return cls(**raw)
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(path).with_suffix(".tmp")
+        tmp.write_bytes(self.dumps())
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str) -> "BankSnapshot":
+        return cls.loads(Path(path).read_bytes())
+
+
+def capture(bank) -> BankSnapshot:
+    origin = bank.start_wall_ts
+    to_sim = bank.sim_minutes_per_real_second()
+
+    def rel(ts: float | None) -> float | None:
+        if ts is None:
+            return None
+        return (ts - origin) * to_sim
+
+    now = bank.now()
+    remaining: Dict[str, float] = {}
+    for teller, customer in bank.busy_customer_by_teller.items():
+        total = bank.service_time_by_customer.get(customer, 0.0)
+        started = bank.metrics.customers[customer].start_service_ts
+        elapsed = (now - started) if started is not None else 0.0
+        remaining[teller] = max(0.0, total - elapsed) * to_sim
+
+    pending = set(bank.queue) | set(bank.busy_customer_by_teller.values())
+    missing = sorted(c for c in pending if c not in bank.service_time_by_customer)
+    if missing:
+        # Bez trajanja usluge klijent se ne može ponovno pokrenuti pri restore-u.
+        raise ValueError(f"Nema zapisanog trajanja usluge za klijente: {', '.join(missing)}")
+    service_sim_min = {c: bank.service_time_by_customer[c] * to_sim for c in pending}
+    in_flight = {
+        c: t * to_sim
+        for c, t in bank.service_time_by_customer.items()
+        if c not in pending and c not in bank.metrics.customers
+    }
+
+    customers = [
+        (
+            rec.customer_jid,
+            rel(rec.arrival_ts),
+            rel(rec.start_service_ts),
+            rel(rec.end_ts),
+            rec.teller_jid,
+        )
+        for rec in bank.metrics.customers.values()
+    ]
+
+    return BankSnapshot(
+        version=SNAPSHOT_VERSION,
+        scenario=bank.scenario,
+        sim_minutes_elapsed=bank.sim_minutes_elapsed(),
+        queue=list(bank.queue),
+        service_sim_min_by_customer=service_sim_min,
+        busy_customer_by_teller=dict(bank.busy_customer_by_teller),
+        remaining_sim_min_by_teller=remaining,
+        in_flight_sim_min_by_customer=in_flight,
+        customers=customers,
+        queue_series=[(rel(ts), qlen) for ts, qlen in bank.metrics.queue_series],
+        rng_state=random.getstate(),
+    )
+
+
+def restore_metrics(snap: BankSnapshot, origin_ts: float, sim_min_per_real_s: float) -> Metrics:
+    def abs_ts(m: float | None) -> float | None:
+        if m is None:
+            return None
+        return origin_ts + m / sim_min_per_real_s
+
+    metrics = Metrics()
+    for jid, arrival, start, end, teller in snap.customers:
+        metrics.customers[jid] = CustomerRecord(
+            customer_jid=jid,
+            arrival_ts=abs_ts(arrival),
+            start_service_ts=abs_ts(start),
+            end_ts=abs_ts(end),
+            teller_jid=teller,
+        )
+    metrics.queue_series = [(abs_ts(m), qlen) for m, qlen in snap.queue_series]
+    return metrics
@@ -0,0 +1,147 @@
+import asyncio
+import datetime
+
+import pytest
+
+pytest.importorskip("spade")
+
+from spade.behaviour import PeriodicBehaviour
+
+from src.sim import profiling
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+
+    async def fake_sleep(seconds):
+        clock.now += seconds
+
+    monkeypatch.setattr(profiling, "time", clock)
+    monkeypatch.setattr(profiling.asyncio, "sleep", fake_sleep)
+    return clock
+
+
+class FakeBehaviour:
+    def __init__(self, clock: FakeClock, mailbox: int = 0) -> None:
+        self.clock = clock
+        self.mailbox = mailbox
+
+    async def receive(self, timeout=None):
+        self.clock.now += 0.5
+        return None
+
+    def mailbox_size(self) -> int:
+        return self.mailbox
+
+    async def run(self):
+        await self.receive(timeout=1)
+        await profiling.modelled_sleep(2.0)
+        self.clock.now += 0.003  # stvarni rad behavioura
+
+
+class FakePeriodic(PeriodicBehaviour):
+    period = datetime.timedelta(seconds=0.5)
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+
+    async def run(self):
+        self.clock.now += 0.001
+
+
+class FakeAgent:
+    def __init__(self, jid: str, behaviours: list) -> None:
+        self.jid = jid
+        self.behaviours = behaviours
+        self.alive = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+def test_histogram_quantiles_and_dict():
+    h = profiling.Histogram()
+    assert h.quantile(0.5) is None
+
+    for v in (0.03, 0.7, 0.7, 3.0, 20000.0):
+        h.observe(v)
+
+    assert h.quantile(0.5) == 1
+    assert h.quantile(0.7) == 5
+    # Kvantil u zadnjem (otvorenom) bucketu vraća maksimum.
+    assert h.quantile(0.95) == 20000.0
+
+    d = h.to_dict()
+    assert d["count"] == 5
+    assert d["max_ms"] == 20000.0
+    assert d["mean_ms"] == pytest.approx(sum((0.03, 0.7, 0.7, 3.0, 20000.0)) / 5)
+    assert d["buckets"][0] == 1
+    assert d["buckets"][4] == 2
+    assert d["buckets"][6] == 1
+    assert d["buckets"][-1] == 1
+
+
+def test_busy_time_excludes_receive_and_modelled_sleep(clock):
+    p = profiling.Profiler()
+    agent = FakeAgent("teller1@localhost", [FakeBehaviour(clock)])
+    p.instrument(agent)
+
+    asyncio.run(agent.behaviours[0].run())
+
+    report = p.report()
+    busy = report["behaviour_busy_time"]["FakeAgent.FakeBehaviour"]
+    assert busy["count"] == 1
+    assert busy["max_ms"] == pytest.approx(3.0)
+    wait = report["behaviour_receive_wait"]["FakeAgent.FakeBehaviour"]
+    assert wait["max_ms"] == pytest.approx(500.0)
+
+
+def test_periodic_tick_drift(clock):
+    p = profiling.Profiler()
+    beh = FakePeriodic(clock)
+    agent = FakeAgent("bank@localhost", [beh])
+    p.instrument(agent)
+
+    async def ticks():
+        await beh.run()
+        clock.now += 0.7  # tick kasni 0.2 s za periodom od 0.5 s
+        await beh.run()
+
+    asyncio.run(ticks())
+
+    drift = p.report()["periodic_tick_drift"]["FakeAgent.FakePeriodic"]
+    assert drift["period_s"] == 0.5
+    assert drift["count"] == 1
+    assert drift["max_ms"] == pytest.approx(201.0)
+
+
+def test_mailbox_sampling_aggregates_customers_and_drops_dead_agents(clock):
+    p = profiling.Profiler()
+    bank = FakeAgent("bank@localhost", [FakeBehaviour(clock, mailbox=4)])
+    c1 = FakeAgent("customer1@localhost", [FakeBehaviour(clock, mailbox=1)])
+    c2 = FakeAgent("customer2@localhost", [FakeBehaviour(clock, mailbox=2)])
+    p.instrument(bank)
+    p.instrument(c1, aggregate=True)
+    p.instrument(c2, aggregate=True)
+
+    p._sample_mailboxes()
+    c2.alive = False
+    p._sample_mailboxes()
+
+    depth = p.report()["mailbox_depth"]
+    assert set(depth) == {"bank@localhost", "FakeAgent"}
+    assert depth["bank@localhost"] == {"samples": 2, "mean": 4.0, "max": 4, "last": 4}
+    assert depth["FakeAgent"] == {"samples": 2, "mean": 2.0, "max": 3, "last": 1}
+    assert "customer2@localhost" not in p._agents
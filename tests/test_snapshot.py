@@ -0,0 +1,101 @@
+import random
+from collections import deque
+
+import pytest
+
+from src.sim import snapshot
+from src.sim.metrics import Metrics
+
+
+class FakeBank:
+    scenario = "pocetak_mjeseca"
+
+    def __init__(self, clock: float) -> None:
+        self.clock = clock
+        self.start_wall_ts = clock - 30.0  # 30 s stvarno = 120 sim min
+        self.metrics = Metrics()
+        self.queue = deque()
+        self.busy_customer_by_teller = {}
+        self.service_time_by_customer = {}
+
+    def now(self) -> float:
+        return self.clock
+
+    def sim_minutes_per_real_second(self) -> float:
+        return 4.0
+
+    def sim_minutes_elapsed(self) -> float:
+        return (self.now() - self.start_wall_ts) * self.sim_minutes_per_real_second()
+
+
+def make_bank() -> FakeBank:
+    bank = FakeBank(clock=1000.0)
+    t0 = bank.start_wall_ts
+    bank.metrics.ensure_customer("a", t0 + 10.0)
+    bank.metrics.set_start_service("a", bank.now() - 2.0, "t1")
+    bank.metrics.ensure_customer("q", t0 + 20.0)
+    bank.metrics.ensure_customer("done", t0 + 1.0)
+    bank.metrics.set_start_service("done", t0 + 2.0, "t2")
+    bank.metrics.set_end("done", t0 + 5.0)
+    bank.metrics.add_queue_point(t0 + 20.0, 1)
+    bank.queue.append("q")
+    bank.busy_customer_by_teller["t1"] = "a"
+    bank.service_time_by_customer.update({"a": 5.0, "q": 3.0, "done": 1.0})
+    return bank
+
+
+def test_round_trip_keeps_queue_busy_tellers_and_rng():
+    random.seed(42)
+    snap = snapshot.capture(make_bank())
+    expected_next = random.random()
+
+    restored = snapshot.BankSnapshot.loads(snap.dumps())
+
+    assert restored.scenario == "pocetak_mjeseca"
+    assert restored.sim_minutes_elapsed == pytest.approx(120.0)
+    assert restored.queue == ["q"]
+    assert restored.busy_customer_by_teller == {"t1": "a"}
+    # 5 s usluge, 2 s već odrađeno -> 3 s = 12 sim min
+    assert restored.remaining_sim_min_by_teller == {"t1": pytest.approx(12.0)}
+    assert restored.service_sim_min_by_customer == {"a": pytest.approx(20.0), "q": pytest.approx(12.0)}
+
+    random.setstate(restored.rng_state)
+    assert random.random() == expected_next
+
+
+def test_restore_metrics_rebases_timestamps():
+    snap = snapshot.BankSnapshot.loads(snapshot.capture(make_bank()).dumps())
+
+    # Novi run s dvostruko dužim stvarnim trajanjem (2 sim min po sekundi).
+    origin = 5000.0
+    metrics = snapshot.restore_metrics(snap, origin, 2.0)
+
+    assert metrics.customers["a"].arrival_ts == pytest.approx(origin + 20.0)
+    assert metrics.customers["a"].start_service_ts == pytest.approx(origin + 56.0)
+    assert metrics.customers["a"].teller_jid == "t1"
+    assert metrics.customers["q"].start_service_ts is None
+    assert metrics.customers["done"].end_ts == pytest.approx(origin + 10.0)
+    assert metrics.unfinished_customers() == ["a", "q"]
+    assert metrics.queue_series == [(pytest.approx(origin + 40.0), 1)]
+
+
+def test_in_flight_arrival_is_kept():
+    bank = make_bank()
+    # Pokrenut, ali banka još nije obradila njegov ARRIVE.
+    bank.service_time_by_customer["new"] = 2.0
+
+    snap = snapshot.BankSnapshot.loads(snapshot.capture(bank).dumps())
+
+    assert snap.in_flight_sim_min_by_customer == {"new": pytest.approx(8.0)}
+    assert "new" not in snap.queue
+    assert "new" not in snap.service_sim_min_by_customer
+    assert "done" not in snap.in_flight_sim_min_by_customer
+
+
+def test_capture_rejects_queued_customer_without_service_time():
+    bank = make_bank()
+    bank.queue.append("x")
+    bank.metrics.ensure_customer("x", bank.now())
+
+    with pytest.raises(ValueError, match="x"):
+        snapshot.capture(bank)